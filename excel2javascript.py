@@ -1,52 +1,100 @@
 import argparse
 import re
+import sys
+from array import array
+from functools import lru_cache
+from heapq import heapify, heappop, heappush
 from collections import defaultdict, deque, namedtuple
 from openpyxl import load_workbook
-from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils import get_column_letter
+from openpyxl.xml.constants import MAX_COLUMN
 import js2py
 from rich.tree import Tree
 from rich import print
 
+# Use the V8-backed MiniRacer for evaluating the generated JavaScript when it is installed,
+# as it is much faster than the pure-Python js2py interpreter.
+try:
+    from py_mini_racer import MiniRacer, JSEvalException
+except ImportError:
+    MiniRacer = None
+
+
+# Patterns used by convert_to_js and extract_and_convert_all_cells, compiled once at import time.
+# Every construct rewritten by convert_to_js is matched by one alternation, so a formula is converted in a single pass.
+_RE_FORMULA_TOKEN = re.compile(
+    r"(\d+),(\d+)%"         # Percentage with comma as decimal point
+    r"|(\d+)%"               # Regular percentage
+    r"|SUM\((\w+):(\w+)\)"  # SUM over a range
+    r"|(\d+),(\d+)"         # Comma between digits
+    r"|MIN|MAX"
+)
+_RE_CELLREF_CLEAN = re.compile(r"[A-Z]+\d+")
+_RE_SPLIT_REF = re.compile(r"([A-Z]+)(\d+)")
+_NO_DOLLAR = str.maketrans('', '', '$')
+
+# Column letters by zero-based column index, and the reverse mapping.
+_COL_LETTERS = [get_column_letter(i) for i in range(1, MAX_COLUMN + 1)]
+_COL_INDEX = {letter: i for i, letter in enumerate(_COL_LETTERS)}
+
+
+def _split_ref(ref):
+    """Splits a cell reference such as 'AB12' into its column letters and row number, or returns None."""
+    match = _RE_SPLIT_REF.fullmatch(ref)
+    if match:
+        return match.group(1), match.group(2)
+    return None
+
+
+def _expand_sum(start_ref, end_ref, text):
+    """Expands SUM(start_ref:end_ref) into a sequence of additions over the columns of the range, or returns text."""
+    start, end = _split_ref(start_ref), _split_ref(end_ref)
+    if not start or not end or start[0] not in _COL_INDEX or end[0] not in _COL_INDEX:
+        return text
+    col1, row1 = start
+    return '+'.join(_COL_LETTERS[i] + row1 for i in range(_COL_INDEX[col1], _COL_INDEX[end[0]] + 1))
+
+
+def _convert_token(m):
+    """Converts a single construct matched by _RE_FORMULA_TOKEN to JavaScript."""
+    text, pct_int, pct_frac, pct, sum_start, sum_end, int_part, frac_part = m.group(0, 1, 2, 3, 4, 5, 6, 7)
+    
+    # Convert percentages with comma as decimal point to float.
+    if pct_int is not None:
+        return str(int(pct_int) + int(pct_frac) / 100.0) + "/100"
+    
+    # Convert regular percentages to float.
+    if pct is not None:
+        return str(int(pct)) + "/100"
+    
+    # Correctly convert SUM to sequence of additions.
+    if sum_start is not None:
+        return _expand_sum(sum_start, sum_end, text)
+    
+    # Replace a comma between digits with a dot.
+    if int_part is not None:
+        return f"{int_part}.{frac_part}"
+    
+    # Replace MIN and MAX with Math.min and Math.max.
+    return "Math.min" if text == "MIN" else "Math.max"
 
+
+@lru_cache(maxsize=None)
 def convert_to_js(formula):
     """
     Converts Excel formula syntax to JavaScript syntax.
     
     Args:
-        formula (str): A string representing an Excel formula.
+        formula (str): A string representing an Excel formula, with $ symbols already stripped from cell references.
     
     Returns:
         str: A string representing the equivalent JavaScript expression.
         
     Notes:
         This function handles various Excel-specific syntax quirks and translates them into JavaScript-compatible syntax.
+        Results are memoized, since identical formulas (e.g. copied down a column) recur often in spreadsheets.
     """
-    # Convert percentages with comma as decimal point to float.
-    formula = re.sub(r"(\d+),(\d+)%", lambda m: str(int(m.group(1)) + int(m.group(2)) / 100.0) + "/100", formula)
-    
-    # Convert regular percentages to float.
-    formula = re.sub(r"(\d+)%", lambda m: str(int(m.group(1))) + "/100", formula)
-    
-    # Correctly convert SUM to sequence of additions.
-    formula = re.sub(
-        r"SUM\((\w+):(\w+)\)", 
-        lambda m: '+'.join(
-            f"{get_column_letter(column_index_from_string(m.group(1)[:1]) + i)}{m.group(1)[1:]}" 
-            for i in range(column_index_from_string(m.group(2)[:1]) - column_index_from_string(m.group(1)[:1]) + 1)
-        ), 
-        formula
-    )
-    
-    # Replace MIN and MAX with Math.min and Math.max.
-    formula = formula.replace("MIN", "Math.min").replace("MAX", "Math.max")
-    
-    # Replace every instance of a comma between digits with a dot.
-    formula = re.sub(r"(\d+),(\d+)", r"\1.\2", formula)
-    
-    # Remove $ symbols from cell references.
-    formula = formula.replace("$", "")
-    
-    return formula
+    return _RE_FORMULA_TOKEN.sub(_convert_token, formula)
 
 
 def extract_and_convert_all_cells(sheet):
@@ -54,7 +102,8 @@ def extract_and_convert_all_cells(sheet):
     Extracts and converts all cells in the given Excel sheet to JavaScript.
     
     Args:
-        sheet (Worksheet): An OpenPyXL Worksheet object representing the Excel sheet.
+        sheet (Worksheet): An OpenPyXL Worksheet object representing the Excel sheet. A read-only worksheet is
+            recommended, as only cell values are needed.
     
     Returns:
         tuple: A tuple containing:
@@ -62,32 +111,45 @@ def extract_and_convert_all_cells(sheet):
             - A dependency graph representing the dependencies between cells.
             - A dictionary mapping cell references to their original formulas.
     """
-    all_cells = defaultdict(str)
+    all_cells = {}
     dependency_graph = defaultdict(set)
-    original_formulas = defaultdict(str)
-    defined_cells = set()
-    
-    for row_idx, row in enumerate(sheet.iter_rows(), start=1):
-        for col_idx, cell in enumerate(row, start=1):
-            cell_ref = get_column_letter(col_idx) + str(row_idx)
-
-            if isinstance(cell.value, (int, float)):
-                all_cells[cell_ref] = f"var {cell_ref} = {cell.value};"
-                defined_cells.add(cell_ref)
-            elif isinstance(cell.value, str) and cell.value.startswith('='):
-                original_formulas[cell_ref] = cell.value
-                formula = cell.value[1:]
-                js_formula = convert_to_js(formula)
+    original_formulas = {}
+    all_refs = set()  # Every cell referenced by a formula
+    
+    # Bind frequently used lookups to locals, as this loop runs once per non-empty cell.
+    col_letters = _COL_LETTERS
+    find_refs = _RE_CELLREF_CLEAN.findall
+    is_ref = _RE_CELLREF_CLEAN.fullmatch
+    # Cell references are interned, so that each one is stored once however many containers and formulas refer to it.
+    intern = sys.intern
+    
+    for row_idx, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+        row_str = str(row_idx)
+        for col_idx, value in enumerate(row):
+            if value is None:
+                continue
+            cell_ref = intern(col_letters[col_idx] + row_str)
+
+            if isinstance(value, (int, float)):
+                all_cells[cell_ref] = f"var {cell_ref} = {value};"
+            elif isinstance(value, str) and value.startswith('='):
+                original_formulas[cell_ref] = value
+                # Strip $ symbols from cell references once, up front.
+                clean = value[1:].translate(_NO_DOLLAR)
+                # Plain numbers and single cell references need no conversion, so they skip convert_to_js.
+                if clean.isdigit():
+                    js_formula, deps = clean, ()
+                elif is_ref(clean):
+                    js_formula, deps = clean, (intern(clean),)
+                else:
+                    js_formula, deps = convert_to_js(clean), [intern(dep) for dep in find_refs(clean)]
                 all_cells[cell_ref] = f"var {cell_ref} = {js_formula};"
-                defined_cells.add(cell_ref)
-                var_refs = re.findall(r'[A-Z]+\$?\d+', formula)
-                for var_ref in var_refs:
-                    cleaned_var_ref = var_ref.replace('$', '')
-                    dependency_graph[cell_ref].add(cleaned_var_ref)
+                if deps:
+                    dependency_graph[cell_ref].update(deps)
+                    all_refs.update(deps)
                                           
-    # Initialize undefined variables to 0
-    all_vars = set(all_cells.keys()) | set(var for deps in dependency_graph.values() for var in deps)
-    undefined_vars = all_vars - defined_cells
+    # Initialize undefined variables to 0. At this point all_cells holds exactly the defined cells.
+    undefined_vars = all_refs.difference(all_cells)
     for var in undefined_vars:
         all_cells[var] = f"var {var} = 0;"
     
@@ -108,123 +170,100 @@ def topological_sort_all_cells(graph, all_cells):
     Raises:
         ValueError: If a cycle is detected in the graph.
     """
-    sorted_nodes = []
-    indegree = defaultdict(int)
-
-    # Compute the in-degree of each node.
-    for node, neighbors in graph.items():
-        for neighbor in neighbors:
-            indegree[neighbor] += 1
+    # Each cell is mapped to an integer id, so that the graph and in-degrees can be stored in lists and arrays.
+    names = list(all_cells)
+    ids = {name: i for i, name in enumerate(names)}
+    dependants = [[] for _ in names]
+    indegree = array('i', [0]) * len(names)
+    sorted_ids = []
+
+    # Compute the in-degree of each node. Edges point from a cell to its dependencies,
+    # so a cell's in-degree is the number of dependencies it is waiting on.
+    for node, name in enumerate(names):
+        for dep in graph.get(name, ()):
+            dep_id = ids.get(dep)
+            if dep_id is not None:
+                dependants[dep_id].append(node)
+                indegree[node] += 1
     
     # Nodes that have no incoming edges (indegree is zero) can be processed.
     # Initially, all nodes with zero in-degree are added to the queue.
-    zero_indegree_nodes = set(node for node in all_cells if indegree[node] == 0)
-    queue = deque(zero_indegree_nodes)
+    queue = deque(node for node in range(len(names)) if indegree[node] == 0)
 
     while queue:
         node = queue.popleft()
-        sorted_nodes.append(node)
+        sorted_ids.append(node)
         
-        # For each neighbor of the node, reduce its in-degree by 1, 
+        # For each dependant of the node, reduce its in-degree by 1, 
         # since we are processing the current node and ‘removing’ its outgoing edges.
-        for neighbor in graph.get(node, []):
-            indegree[neighbor] -= 1
+        for dependant in dependants[node]:
+            indegree[dependant] -= 1
             
-            # If in-degree of the neighbor becomes zero, add it to the queue.
-            if indegree[neighbor] == 0:
-                queue.append(neighbor)
+            # If in-degree of the dependant becomes zero, add it to the queue.
+            if indegree[dependant] == 0:
+                queue.append(dependant)
 
     # If there are still nodes left to process, it means there's a cycle.
-    # In this case, we add a node with the smallest in-degree to the queue.
-    remaining_nodes = set(all_cells) - set(sorted_nodes)
-    while remaining_nodes:
-        min_indegree_node = min(remaining_nodes, key=lambda node: indegree[node])
-        sorted_nodes.append(min_indegree_node)
-        remaining_nodes.remove(min_indegree_node)
-        for neighbor in graph.get(min_indegree_node, []):
-            indegree[neighbor] -= 1
+    # In this case, we repeatedly add the remaining node with the smallest in-degree.
+    # A heap keyed on in-degree finds it; entries made stale by a later decrement are skipped.
+    emitted = bytearray(len(names))
+    for node in sorted_ids:
+        emitted[node] = 1
+    heap = [(indegree[node], node) for node in range(len(names)) if not emitted[node]]
+    heapify(heap)
+    while heap:
+        degree, min_indegree_node = heappop(heap)
+        if emitted[min_indegree_node] or degree != indegree[min_indegree_node]:
+            continue
+        emitted[min_indegree_node] = 1
+        sorted_ids.append(min_indegree_node)
+        for dependant in dependants[min_indegree_node]:
+            if not emitted[dependant]:
+                indegree[dependant] -= 1
+                heappush(heap, (indegree[dependant], dependant))
             
-    return sorted_nodes
+    return [names[node] for node in sorted_ids]
 
 
-def resolve_and_sort(graph, all_cells):
+def topo_sort_with_cycle_removal(graph, nodes):
     """
-    Resolves and sorts all cells based on their dependencies.
+    Breaks any cycles in the given graph and sorts the nodes in a single depth-first search.
     
     Args:
         graph (dict): A dictionary representing the dependency graph.
-        all_cells (dict): A dictionary mapping cell references to their JavaScript representations.
+        nodes (iterable): The nodes to sort, e.g. a dictionary mapping cell references to their JavaScript representations.
         
     Returns:
-        list: A list of cell references in resolved and sorted order.
-        
-    Raises:
-        ValueError: If a cycle is detected in the graph.
-        
-    Notes:
-        This function uses a depth-first search approach to resolve dependencies recursively,
-        ensuring each cell is resolved before its dependents.
-    """
-    resolved = set()  # Resolved nodes
-    unresolved = set()  # Nodes which are being resolved
-    sorted_nodes = []  # The final sorted list of nodes
-    
-    def resolve(node):
-        if node in resolved:
-            return True
-        if node in unresolved:
-            return False  # Found a cycle
-        unresolved.add(node)
-        for dep in graph.get(node, []):
-            if not resolve(dep):
-                return False  # Propagate cycle detection
-        resolved.add(node)
-        unresolved.remove(node)
-        sorted_nodes.append(node)
-        return True
-    
-    for node in all_cells:
-        if not resolve(node):
-            raise ValueError(f"The graph has a cycle, possibly due to a circular reference involving {node}")
-    
-    return sorted_nodes
-
-
-def detect_and_break_cycles(graph):
-    """
-    Detects and breaks any cycles present in the given graph.
-    
-    Args:
-        graph (dict): A dictionary representing the dependency graph.
+        list: A list of cell references, with each cell placed after the cells it depends on.
         
     Notes:
-        This function modifies the input graph in-place by removing edges to break detected cycles.
+        This function breaks cycles and sorts the cells in the same traversal. Edges leading back to a node
+        that is still being resolved are skipped, which breaks every cycle, and every node is emitted in post-order.
+        The graph itself is left unchanged, so callers can still show the circular references.
     """
     State = namedtuple('State', 'WHITE GRAY BLACK')
     states = defaultdict(lambda: State.WHITE)
-    cycle_edges = set()
-    
-    def dfs(vertex, path):
-        states[vertex] = State.GRAY
-        for neighbor in graph[vertex]:
-            if states[neighbor] == State.WHITE:
-                if dfs(neighbor, path + [vertex]):
-                    cycle_edges.add((vertex, neighbor))
-            elif states[neighbor] == State.GRAY:
-                cycle_edges.add((vertex, neighbor))
-                return True  # A cycle is found.
-        states[vertex] = State.BLACK
-        return False  # No cycle is found.
-    
-    # Here we are making a copy of the keys (vertices) of the graph 
-    # so that we do not modify the graph while iterating over it
-    for vertex in list(graph.keys()):
-        if states[vertex] == State.WHITE:
-            dfs(vertex, [])
-    
-    # After all vertices have been processed, remove the cycle edges from the graph
-    for edge in cycle_edges:
-        graph[edge[0]].remove(edge[1])  # Break the cycle by removing the edge.
+    sorted_nodes = []
+    
+    for node in nodes:
+        if states[node] != State.WHITE:
+            continue
+        states[node] = State.GRAY
+        stack = [(node, iter(graph.get(node, ())))]
+        while stack:
+            current, deps = stack[-1]
+            dep = next(deps, None)
+            if dep is None:
+                # All dependencies are resolved, so the current node can be emitted.
+                states[current] = State.BLACK
+                stack.pop()
+                sorted_nodes.append(current)
+            elif states[dep] == State.WHITE:
+                states[dep] = State.GRAY
+                stack.append((dep, iter(graph.get(dep, ()))))
+            # A GRAY dependency closes a cycle; skipping the edge breaks it.
+    
+    return sorted_nodes
 
 
 def convert_excel_to_js(excel_path):
@@ -236,43 +275,100 @@ def convert_excel_to_js(excel_path):
     
     Returns:
         tuple: A tuple containing:
-            - A string representing the JavaScript code equivalent to the Excel file.
+            - A list of JavaScript lines, one per cell, in dependency order. Join them with newlines to get the full code.
             - A dictionary mapping cell references to their original formulas in the Excel file.
+            - A dependency graph representing the dependencies between cells, including any circular references.
+            - A dictionary mapping cell references to their JavaScript expressions.
     """
-    workbook = load_workbook(excel_path, data_only=False)
-    sheet = workbook.active
-    
-    all_cells_js, dependency_graph, original_formulas = extract_and_convert_all_cells(sheet)
-    
-    # Detect and break any cycles in the dependency graph
-    detect_and_break_cycles(dependency_graph)
-    
-    sorted_all_cells = resolve_and_sort(dependency_graph, all_cells_js)
+    # Read-only mode streams the sheet XML without building a Cell object per coordinate.
+    workbook = load_workbook(excel_path, data_only=False, read_only=True)
+    try:
+        sheet = workbook.active
+        # Read-only sheets trust the stored dimension record, which some writers leave stale, so re-read every row.
+        sheet.reset_dimensions()
+        all_cells_js, dependency_graph, original_formulas = extract_and_convert_all_cells(sheet)
+    finally:
+        workbook.close()
+    
+    # Sort the cells, skipping the edges that close cycles, without modifying the dependency graph
+    sorted_all_cells = topo_sort_with_cycle_removal(dependency_graph, all_cells_js)
     sorted_all_js_lines = [all_cells_js[cell_ref] for cell_ref in sorted_all_cells if cell_ref in all_cells_js]
     
-    return '\n'.join(sorted_all_js_lines), original_formulas
+    # Strip the "var X = " prefix and trailing semicolon, so the tree printers can look up expressions directly.
+    js_formulas = {cell_ref: line.split(' = ', 1)[1][:-1] for cell_ref, line in all_cells_js.items()}
+    
+    return sorted_all_js_lines, original_formulas, dependency_graph, js_formulas
 
 
-def execute_js_and_compute_cell(js_code, cell):
+def iter_js_lines(js_lines):
+    """Yields the given JavaScript lines terminated by newlines, so they can be written out without joining them first."""
+    for line in js_lines:
+        yield line + "\n"
+
+
+def make_js_context(js_code):
     """
-    Executes the given JavaScript code and computes the value of the specified cell.
+    Executes the given JavaScript code once and returns the resulting context.
     
     Args:
         js_code (str): The JavaScript code to execute.
-        cell (str): The cell whose value to compute.
     
     Returns:
-        Any: The computed value of the cell, or None if an error occurs during execution.
+        MiniRacer or EvalJs: A context holding the values of all cells, or None if an error occurs during execution.
+        
+    Notes:
+        Building the context is the expensive part of computing a cell, so callers that read
+        several cells should create it once and pass it to read_cell.
+        MiniRacer is used if it is installed, otherwise the code is run with js2py.
     """
+    if MiniRacer is not None:
+        try:
+            context = MiniRacer()
+            context.eval(js_code)
+            return context
+        except JSEvalException as e:
+            print(f"Error executing JavaScript: {str(e)}")
+            return None
     try:
         context = js2py.EvalJs()
         context.execute(js_code)
+        return context
+    except js2py.base.PyJsException as e:
+        print(f"Error executing JavaScript: {str(e)}")
+        return None
+
+
+def read_cell(context, cell):
+    """Returns the value of the given cell from a context created by make_js_context, or None."""
+    if context is None:
+        return None
+    if MiniRacer is not None and isinstance(context, MiniRacer):
+        try:
+            return context.eval(cell)
+        except JSEvalException as e:
+            print(f"Error computing {cell}: {str(e)}")
+            return None
+    try:
         return getattr(context, cell, None)
     except js2py.base.PyJsException as e:
         print(f"Error computing {cell}: {str(e)}")
         return None
 
 
+def execute_js_and_compute_cell(js_code, cell):
+    """
+    Executes the given JavaScript code and computes the value of the specified cell.
+    
+    Args:
+        js_code (str): The JavaScript code to execute.
+        cell (str): The cell whose value to compute.
+    
+    Returns:
+        Any: The computed value of the cell, or None if an error occurs during execution.
+    """
+    return read_cell(make_js_context(js_code), cell)
+
+
 # def show_dependencies(graph, start_cell, js_code):
 #     """
 #     Constructs and prints a dependency tree for the given cell using the rich library.
@@ -310,47 +406,68 @@ def execute_js_and_compute_cell(js_code, cell):
 #     print(tree)
 
 
-def build_tree(graph, node, parent, formatter, visited):
-    """Recursive function to build the tree."""
+def build_tree(graph, node, parent, formatter, visited, cache=None):
+    """
+    Recursive function to build the tree.
+    
+    If a cache dict is given, completed subtrees are stored in it by node and reused
+    when the same node is reached again, instead of being rebuilt.
+    Returns False if a circular dependency was found below the node, True otherwise.
+    """
     if node in visited:
         print(f"Warning: Detected a circular dependency involving {node}")
-        return
+        return False
     visited.add(node)
+    complete = True
     for neighbor in graph.get(node, []):
+        if cache is not None and neighbor in cache:
+            parent.children.append(cache[neighbor])
+            continue
         branch = parent.add(formatter(neighbor))
-        build_tree(graph, neighbor, branch, formatter, visited)
+        if build_tree(graph, neighbor, branch, formatter, visited, cache):
+            if cache is not None:
+                cache[neighbor] = branch
+        else:
+            complete = False
     visited.remove(node)
+    return complete
 
 
-def show_dependencies(graph, start_cell, js_code):
+def show_dependencies(graph, start_cell, js_code, js_formulas):
     """Prints a dependency tree for the given cell using the rich library."""
+    context = make_js_context(js_code)
+    
     def formatter(cell):
-        formula = extract_formula(js_code, cell)
-        value = execute_js_and_compute_cell(js_code, cell)
+        formula = extract_formula(js_formulas, cell)
+        value = read_cell(context, cell)
         if formula.replace(".", "", 1).isdigit():
             return f"[magenta]{cell}[/magenta] ({value})"
         else:
             return f"[magenta]{cell}[/magenta] ({formula} => {value})"
     
+    # Subtrees of cells reached more than once, whether from several parents or several roots, are built only once.
+    cache = {}
+    
     if start_cell:
         tree = Tree(formatter(start_cell))
-        build_tree(graph, start_cell, tree, formatter, set())
+        build_tree(graph, start_cell, tree, formatter, set(), cache)
         print(tree)
     else:
-        roots = set(graph.keys()) - set(dependent for dependents in graph.values() for dependent in dependents)
+        roots = set(graph.keys()) - set().union(*graph.values())
         for node in roots:
             tree = Tree(formatter(node))
-            build_tree(graph, node, tree, formatter, set())
+            build_tree(graph, node, tree, formatter, set(), cache)
             print(tree)
 
 
-def show_dependants(graph, start_cell, js_code):
+def show_dependants(graph, start_cell, js_code, js_formulas):
     """Prints a dependant tree for the given cell using the rich library."""
     reversed_graph = reverse_graph(graph)
+    context = make_js_context(js_code)
     
     def formatter(cell):
-        formula = extract_formula(js_code, cell)
-        value = execute_js_and_compute_cell(js_code, cell)
+        formula = extract_formula(js_formulas, cell)
+        value = read_cell(context, cell)
         if formula.replace(".", "", 1).isdigit():
             return f"[magenta]{cell}[/magenta] ({value})"
         else:
@@ -371,22 +488,17 @@ def show_dependants(graph, start_cell, js_code):
             print(tree)
 
 
-def extract_formula(js_code, cell):
-    match = re.search(f"var {cell} = (.*?);", js_code)
-    if match:
-        return match.group(1)
-    return ""
+def extract_formula(js_formulas, cell):
+    """Returns the JavaScript expression of the given cell, or an empty string if it is not defined."""
+    return js_formulas.get(cell, "")
 
 
 def reverse_graph(graph):
     """Reverses the direction of the graph edges."""
-    reversed_graph = {}
+    reversed_graph = defaultdict(set)
     for node, dependents in graph.items():
         for dependent in dependents:
-            if dependent in reversed_graph:
-                reversed_graph[dependent].add(node)
-            else:
-                reversed_graph[dependent] = set([node])
+            reversed_graph[dependent].add(node)
     return reversed_graph
 
 
@@ -401,38 +513,37 @@ if __name__ == "__main__":
     parser.add_argument('-c', '--compute', help='Compute the value of a specific cell using generated JS')
     parser.add_argument('-f', '--formula', help='Print the formula or numeric value of a specific cell from Excel')
     parser.add_argument('-o', '--output', help='Path to JS file to output to, optional, if not provided, will print to stdout')
-    parser.add_argument('-d', '--show-dependencies', nargs='?', const=None, help='Show the dependency tree of a specific cell or of all cells if no cell is specified')
+    parser.add_argument('-d', '--show-dependencies', nargs='?', const='', help='Show the dependency tree of a specific cell or of all cells if no cell is specified')
     parser.add_argument('-s', '--show-dependants', help='Show the dependant tree of a specific cell')
     args = parser.parse_args()
 
-    generated_js, original_formulas = convert_excel_to_js(args.excel_file)
-    _, dependency_graph, _ = extract_and_convert_all_cells(load_workbook(args.excel_file, data_only=False).active)
+    js_lines, original_formulas, dependency_graph, js_formulas = convert_excel_to_js(args.excel_file)
 
     if args.show_dependencies is not None:
-        show_dependencies(dependency_graph, args.show_dependencies, generated_js)
+        show_dependencies(dependency_graph, args.show_dependencies, '\n'.join(js_lines), js_formulas)
     elif args.show_dependants:
-        show_dependants(dependency_graph, args.show_dependants, generated_js)
+        show_dependants(dependency_graph, args.show_dependants, '\n'.join(js_lines), js_formulas)
     elif args.formula:
         print(f"The original formula/value of {args.define} is {original_formulas.get(args.define, 'Not Found')}")
     elif args.compute:
-        computed_value = execute_js_and_compute_cell(generated_js, args.compute)
+        computed_value = execute_js_and_compute_cell('\n'.join(js_lines), args.compute)
         print(f"The computed value of {args.compute} is {computed_value}")
     elif args.output:
         # Test if the JavaScript contains any errors
         test_cell = list(original_formulas.keys())[0] if original_formulas else None
         if test_cell:
-            computed_value = execute_js_and_compute_cell(generated_js, test_cell)
+            computed_value = execute_js_and_compute_cell('\n'.join(js_lines), test_cell)
             if computed_value is None:
                 print(f"Error in the generated JavaScript. Not saving to {args.output}.")
                 exit(1)
         
-        # Try writing the JavaScript to the specified output file
+        # Try writing the JavaScript to the specified output file, line by line
         try:
             with open(args.output, 'w') as js_file:
-                js_file.write(generated_js)
+                js_file.writelines(iter_js_lines(js_lines))
                 print(f"Successfully saved JavaScript to {args.output}")
         except IOError as e:
             print(f"Error writing to {args.output}: {str(e)}")
     else:
-        print(generated_js)
+        print('\n'.join(js_lines))
 